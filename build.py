@@ -7,11 +7,18 @@ PyInstaller.__main__.run([
     '--add-data=evidence:evidence',
     '--name=SmartSecuritySystem',
     '--hidden-import=pyaudio',
-    '--hidden-import=librosa',
     '--hidden-import=numpy',
     '--hidden-import=cv2',
     '--hidden-import=PIL',
     '--hidden-import=PIL._tkinter_finder',  
+    '--exclude-module=librosa',
+    '--exclude-module=numba',
+    '--exclude-module=llvmlite',
+    '--exclude-module=scipy',
+    '--exclude-module=sklearn',
+    '--exclude-module=resampy',
+    '--exclude-module=matplotlib',
+    '--exclude-module=tkinter.test',
     '--clean',
     '--log-level=INFO'
 ])
@@ -3,18 +3,29 @@ from tkinter import ttk, messagebox
 from PIL import Image, ImageTk
 import wave
 import threading
+import queue
+import concurrent.futures
+import functools
 import time
 import json
+import math
+import collections
 import cv2
 import numpy as np
 import pyaudio
-import librosa
 import os
 import sys
 import requests
+from requests.adapters import HTTPAdapter
 import random
 from datetime import datetime
 
+# Optional: PyTurboJPEG encodes evidence faster than cv2.imencode if installed
+try:
+    from turbojpeg import TurboJPEG, TJFLAG_FASTDCT
+except ImportError:
+    TurboJPEG = None
+
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -25,42 +36,111 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 class SmartSecurityApp:
+    # Incident fields that are the same for every report from this device
+    _INCIDENT_TMPL = {
+        "device_id": "Hor92311A",
+        "is_verified": False,
+        "device_location": "Main Gate",
+        "neighborhood": "Zone A",
+        "evidence_type": "IMAGE",
+        "ai_analysis": None
+    }
+    _AUTO_TMPL = {**_INCIDENT_TMPL, "alert_message": "System-generated alert"}
+    _MANUAL_TMPL = {**_INCIDENT_TMPL, "alert_message": "Manual alert"}
+    MANUAL_SEVERITY = 3  # Manual reports carry no sensor reading to score
+
     def __init__(self, root):
         self.root = root
         self.root.title("Smart Security System (Real Sensors)")
         self.root.geometry("800x600")
         
         # Configuration
-        self.SOUND_THRESHOLD = 0.03
-        self.MOTION_THRESHOLD = 10000
+        self.SOUND_THRESHOLD = 0.03  # RMS as a fraction of full scale
+        self.MOTION_THRESHOLD = 0.01  # Fraction of the downsampled frame MOG2 must mark as foreground
         self.EVENT_COOLDOWN = 10
         self.RECORDING_DURATION = 10
+        self.SAMPLE_RATE = 44100
+        self.CHUNK_SIZE = 1024
+        self.SAMPLE_FORMAT = pyaudio.paInt16
+        self.JPEG_QUALITY = 85
+        self.FRAME_SIZE = (640, 480)  # (width, height) requested from the camera
+        self.CAMERA_FPS = 30
+        self.CAMERA_READ_RETRIES = 5  # Consecutive failed reads before detection stops
+        # Resolved once: the save paths are built on every trigger
+        self._evidence_dir = resource_path("evidence")
+        self._incidents_path = resource_path("incidents.jsonl")
+        self.MAX_ALERT_LINES = 500  # Oldest alerts are dropped beyond this
+        self.PRE_TRIGGER_FRAMES = 5  # 1 Hz frames kept from before a recording starts
         
         # API Configuration
         self.API_BASE_URL = "http://localhost:8000/"  # Django API URL
         self.MAX_IMAGES = 3
         self.MAX_AUDIO = 3
         self.EVIDENCE_INTERVAL = 5  # seconds
+        self.POLL_INTERVAL = 5  # seconds between remote status checks
+        self.POLL_MAX_BACKOFF = 60  # seconds, upper bound while the API is unreachable
+        self.HTTP_TIMEOUT = (3.05, 10)  # (connect, read) seconds for every API request
+        api_base = self.API_BASE_URL.rstrip('/')
+        self._api_urls = {endpoint: f"{api_base}/{endpoint}/" for endpoint in ("incidents", "evidences")}
         self.last_api_send_time = 0
         self.sent_images = 0
         self.sent_audio = 0
         self.incident_id = None
+        # Shared keep-alive HTTP session, plus a small pool so uploads never
+        # block the sensor, writer or Tk threads
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.http.mount('http://', adapter)
+        self.http.mount('https://', adapter)
+        self._http_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='sss-http')
         
         # State variables
-        self.last_event_time = 0
+        self.last_event_time = float('-inf')  # time.monotonic() of the last auto-report
         self.motion_detected = tk.IntVar(value=0)
         self.sound_detected = tk.IntVar(value=0)
+        # Written by the sensor threads; copied into the IntVars on the Tk thread
+        self._motion_flag = 0
+        self._sound_flag = 0
         self.incidents = []
         self.detection_active = False
+        # Set to stop the current run's workers; replaced on every start so a
+        # quick stop/start cannot revive the previous run's threads
+        self._stop_event = threading.Event()
+        self._stop_event.set()
+        self._workers = []  # Daemon threads of the current run: camera, motion, sound, recording
         self.is_recording = False
-        self.frames = []
+        self._audio_buf = bytearray()
+        self._audio_pos = 0
         self.recording_start_time = 0
         self.cap = None
+        # Latest camera frame (raw BGR), published by camera_reader for all consumers
+        self._latest_frame = None
+        self._latest_lock = threading.Lock()
+        self._frame_event = threading.Event()
+        # Raw frames sampled once per second; only encoded if a recording starts.
+        # Replaced on every start so a recording never saves a previous run's frames
+        self._frame_ring = collections.deque(maxlen=self.PRE_TRIGGER_FRAMES)
+        self._displayed_frame = None
+        # Preview images, created on the first frame and then refilled in place
+        self._pil_image = None
+        self._tk_photo = None
         self.audio = None
-        self.stream = None
+        self.use_opencl = False
+        self.turbojpeg = None
+        self._io_queue = queue.Queue()
+        self._io_thread = None
+        # Squared int16 amplitude per sample at SOUND_THRESHOLD; a buffer is loud
+        # when its energy exceeds this times its frame count
+        self._energy_threshold = (self.SOUND_THRESHOLD * 32768) ** 2
+        self._alert_queue = collections.deque()  # Pending alert lines, flushed on the Tk thread
+        self._alert_count = 0  # Lines currently in the alert log
+        self.gui_q = queue.Queue()  # (func, args) to run on the Tk thread
         
         # Initialize resources
+        self.initialize_io_writer()
         self.initialize_camera()
+        self.initialize_opencl()
+        self.initialize_jpeg_encoder()
         self.initialize_audio()
         self.initialize_evidence_dir()
         self.load_incidents()
@@ -70,21 +150,22 @@ class SmartSecurityApp:
         threading.Thread(target=self.poll_detection_flag, daemon=True).start()
 
 
-    def resource_path(relative_path):
-        """ Get absolute path to resource, works for dev and for PyInstaller """
-        try:
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.abspath(".")
-        return os.path.join(base_path, relative_path)
-
-
     def initialize_camera(self):
         """Initialize camera with error handling"""
         try:
             self.cap = cv2.VideoCapture(0)
             if not self.cap.isOpened():
                 raise RuntimeError("Could not initialize camera")
+            # Let the driver deliver frames at display size, and keep only the
+            # newest frame queued so reads are never stale
+            width, height = self.FRAME_SIZE
+            # Ask for MJPG first: compressed frames use far less USB bandwidth
+            # than raw YUYV and are decoded by libjpeg-turbo
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            self.cap.set(cv2.CAP_PROP_FPS, self.CAMERA_FPS)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             # Test camera
             ret, _ = self.cap.read()
             if not ret:
@@ -93,6 +174,52 @@ class SmartSecurityApp:
             messagebox.showerror("Camera Error", f"Camera initialization failed: {str(e)}")
             self.cap = None
 
+    def initialize_opencl(self):
+        """Enable OpenCV's OpenCL backend for motion detection when a device is available"""
+        try:
+            cv2.ocl.setUseOpenCL(True)
+            self.use_opencl = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+        except Exception:
+            self.use_opencl = False
+        if self.use_opencl:
+            self.add_alert("⚙️ OpenCL acceleration enabled for motion detection")
+            # OpenCL kernels are compiled on first use; do that up front in the
+            # background so the first detection frame is not delayed
+            threading.Thread(target=self.warm_up_motion, daemon=True).start()
+
+    def warm_up_motion(self):
+        """Run the motion pipeline once on a blank frame to compile its kernels."""
+        try:
+            width, height = self.FRAME_SIZE
+            blank = cv2.UMat(np.zeros((height, width, 3), np.uint8))
+            small = self.downsample_gray(blank)
+            # Throwaway model, so the blank frame never reaches the real background
+            self.motion_score(self.create_bg_subtractor(), small, cv2.UMat(small.get()))
+        except Exception as e:
+            self.add_alert(f"⚠️ OpenCL warm-up failed: {str(e)}")
+
+    def initialize_jpeg_encoder(self):
+        """Use libjpeg-turbo through PyTurboJPEG for evidence images when available"""
+        if TurboJPEG is None:
+            return
+        try:
+            self.turbojpeg = TurboJPEG()
+        except Exception:
+            # Python package present but the native library is missing
+            self.turbojpeg = None
+
+    def encode_jpeg(self, frame):
+        """Encode a BGR frame as JPEG bytes at JPEG_QUALITY"""
+        if self.turbojpeg:
+            return self.turbojpeg.encode(frame, quality=self.JPEG_QUALITY, flags=TJFLAG_FASTDCT)
+        ok, encoded = cv2.imencode('.jpg', frame, [
+            cv2.IMWRITE_JPEG_QUALITY, self.JPEG_QUALITY,
+            cv2.IMWRITE_JPEG_OPTIMIZE, 1,
+        ])
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return encoded
+
     def initialize_audio(self):
         """Initialize audio with error handling"""
         try:
@@ -107,10 +234,60 @@ class SmartSecurityApp:
     def initialize_evidence_dir(self):
         """Create evidence directory with error handling"""
         try:
-            os.makedirs(resource_path("evidence"), exist_ok=True)
+            os.makedirs(self._evidence_dir, exist_ok=True)
         except Exception as e:
             messagebox.showerror("Storage Error", f"Cannot create evidence directory: {str(e)}")
 
+    def initialize_io_writer(self):
+        """Start the background thread that performs all disk writes"""
+        self._io_thread = threading.Thread(target=self.io_writer, daemon=True)
+        self._io_thread.start()
+
+    def io_writer(self):
+        """Run queued disk writes so sensor and UI threads never block on file I/O.
+
+        Items are processed in order, so an upload queued after a write always
+        sees the finished file. A None item, queued by on_close, ends the thread
+        once everything before it is written.
+        """
+        while True:
+            item = self._io_queue.get()
+            if item is None:
+                break
+            op, path, *args = item
+            try:
+                if op == 'jpg':
+                    frame, = args
+                    encoded = self.encode_jpeg(frame)
+                    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+                    fd = os.open(path, flags, 0o644)
+                    try:
+                        # os.write may write less than asked; loop until it is all out
+                        remaining = memoryview(encoded).cast('B')
+                        while remaining:
+                            remaining = remaining[os.write(fd, remaining):]
+                    finally:
+                        os.close(fd)
+                    self.add_alert(f"📸 Evidence saved: {path}")
+                elif op == 'wav':
+                    pcm, sampwidth = args
+                    with wave.open(path, 'wb') as wf:
+                        wf.setnchannels(1)
+                        wf.setsampwidth(sampwidth)
+                        wf.setframerate(self.SAMPLE_RATE)
+                        wf.writeframes(pcm)
+                    self.add_alert(f"🔊 Audio evidence saved: {path}")
+                elif op == 'jsonl':
+                    obj, = args
+                    with open(path, "a") as f:
+                        f.write(json.dumps(obj) + "\n")
+                elif op == 'upload':
+                    # The file is written by now; send it without holding up later writes
+                    evidence_data, content_type = args
+                    self._http_pool.submit(self.upload_evidence, path, evidence_data, content_type)
+            except Exception as e:
+                self.add_alert(f"⚠️ Failed to write {os.path.basename(path)}: {str(e)}")
+
     def setup_ui(self):
         # Main container
         main_frame = ttk.Frame(self.root)
@@ -180,6 +357,35 @@ class SmartSecurityApp:
         
         self.alert_log = tk.Text(alert_frame, height=10, state="disabled")
         self.alert_log.pack(fill=tk.BOTH, expand=True)
+        
+        self.root.after(200, self.pump_sensor_flags)
+        self.root.after(150, self.flush_alerts)
+        self.root.after(50, self.drain_gui_queue)
+
+    def call_in_ui(self, func, *args):
+        """Run func(*args) on the Tk thread; safe to call from any thread."""
+        self.gui_q.put((func, args))
+
+    def drain_gui_queue(self):
+        """Run the UI calls queued by background threads."""
+        while True:
+            try:
+                func, args = self.gui_q.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                func(*args)
+            except Exception as e:
+                self.add_alert(f"⚠️ UI update error: {str(e)}")
+        self.root.after(50, self.drain_gui_queue)
+
+    def pump_sensor_flags(self):
+        """Copy sensor flags into the Tk status variables when they change."""
+        if self._motion_flag != self.motion_detected.get():
+            self.motion_detected.set(self._motion_flag)
+        if self._sound_flag != self.sound_detected.get():
+            self.sound_detected.set(self._sound_flag)
+        self.root.after(200, self.pump_sensor_flags)
 
     def start_detection(self):
         """Start the motion and sound detection."""
@@ -188,185 +394,354 @@ class SmartSecurityApp:
             return
 
         self.detection_active = True
+        stop = self._stop_event = threading.Event()
+        self._frame_ring = collections.deque(maxlen=self.PRE_TRIGGER_FRAMES)
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.add_alert("🟢 Detection system activated")
 
         # Start sensor threads
-        threading.Thread(target=self.motion_detection, daemon=True).start()
+        self._workers = []
+        self.start_worker(self.camera_reader, stop)
+        self.start_worker(self.motion_detection, stop)
         if self.audio:
-            threading.Thread(target=self.sound_detection, daemon=True).start()
+            self.start_worker(self.sound_detection, stop)
 
         self.update_camera()
 
+    def start_worker(self, target, *args):
+        """Run a detection worker on a daemon thread of the current run.
+
+        Daemon, like the io writer and poller: a worker stuck in a driver or
+        network call must not keep the process alive after the window closes.
+        """
+        worker = threading.Thread(target=target, args=args, daemon=True)
+        worker.start()
+        self._workers.append(worker)
+
 
     def stop_detection(self):
         """Stop the motion and sound detection."""
         self.detection_active = False
+        self._stop_event.set()
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.add_alert("🔴 Detection system deactivated")
 
 
+    def end_run(self, stop):
+        """Stop detection after a worker failure, unless that run is already over (Tk thread)."""
+        if stop is self._stop_event and self.detection_active:
+            self.stop_detection()
+
+
     def poll_detection_flag(self):
         """Poll Django API for remote detection start/stop commands."""
+        etag = None
+        status = None
+        delay = self.POLL_INTERVAL
         while True:
             try:
-                response = requests.get("http://127.0.0.1:8000/detection-status/")
+                # Conditional GET: an unchanged status comes back as an empty 304
+                headers = {'If-None-Match': etag} if etag else {}
+                response = self.http.get("http://127.0.0.1:8000/detection-status/", headers=headers,
+                                         timeout=self.HTTP_TIMEOUT)
                 if response.status_code == 200:
+                    etag = response.headers.get('ETag')
                     status = response.json().get("status")
-                    if status == "start" and not self.detection_active:
-                        print("[REMOTE] Starting detection...")
-                        self.start_detection()
-                    elif status == "stop" and self.detection_active:
-                        print("[REMOTE] Stopping detection...")
-                        self.stop_detection()
+                if response.status_code in (200, 304):
+                    self.call_in_ui(self.apply_remote_status, status)
+                delay = self.POLL_INTERVAL
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # Unreachable, refusing or hanging past HTTP_TIMEOUT: back off
+                print(f"[REMOTE] Polling error: {e}")
+                delay = min(delay * 2, self.POLL_MAX_BACKOFF)
             except Exception as e:
                 print(f"[REMOTE] Polling error: {e}")
-            time.sleep(5)
+            time.sleep(delay)
+
 
+    def apply_remote_status(self, status):
+        """Start or stop detection as requested by the API (Tk thread)."""
+        if status == "start" and not self.detection_active:
+            print("[REMOTE] Starting detection...")
+            self.start_detection()
+        elif status == "stop" and self.detection_active:
+            print("[REMOTE] Stopping detection...")
+            self.stop_detection()
+
+    def camera_reader(self, stop):
+        """Read the camera in a single thread and publish the latest frame."""
+        # This run's ring; a reader outliving its run cannot feed the next one
+        ring = self._frame_ring
+        next_ring_sample = 0
+        failures = 0
+        try:
+            while not stop.is_set() and self.cap and self.cap.isOpened():
+                ret, frame = self.cap.read()
+                if not ret:
+                    # Ride out a dropped frame; give up only if the camera stays silent
+                    failures += 1
+                    if failures >= self.CAMERA_READ_RETRIES:
+                        self.add_alert("⚠️ Camera error: failed to read frame")
+                        self.call_in_ui(self.end_run, stop)
+                        break
+                    stop.wait(0.1)
+                    continue
+                failures = 0
+                # Only resize when the camera ignored the requested frame size
+                if (frame.shape[1], frame.shape[0]) != self.FRAME_SIZE:
+                    frame = cv2.resize(frame, self.FRAME_SIZE)
+                with self._latest_lock:
+                    self._latest_frame = frame
+                self._frame_event.set()
+                
+                now = time.monotonic()
+                if now >= next_ring_sample:
+                    ring.append(frame)
+                    next_ring_sample = now + 1.0
+        except Exception as e:
+            self.add_alert(f"⚠️ Camera error: {str(e)}")
+            self.call_in_ui(self.end_run, stop)
+        finally:
+            # Wake motion_detection so it notices the stop without waiting out its timeout
+            self._frame_event.set()
+
+    def wait_for_frame(self, timeout=1.0):
+        """Block until camera_reader publishes a new frame; None on timeout."""
+        if not self._frame_event.wait(timeout):
+            return None
+        self._frame_event.clear()
+        with self._latest_lock:
+            return self._latest_frame
 
     def update_camera(self):
         if self.detection_active and self.cap and self.cap.isOpened():
             try:
-                ret, frame = self.cap.read()
-                if ret:
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frame = cv2.resize(frame, (640, 480))
-                    self.current_frame = frame
+                with self._latest_lock:
+                    frame = self._latest_frame
+                if frame is not None and frame is not self._displayed_frame:
+                    self._displayed_frame = frame
                     
-                    img = Image.fromarray(frame)
-                    imgtk = ImageTk.PhotoImage(image=img)
-                    
-                    self.video_label.imgtk = imgtk
-                    self.video_label.configure(image=imgtk)
+                    if self._pil_image is None:
+                        self._pil_image = Image.new('RGB', self.FRAME_SIZE)
+                    # PIL's raw decoder swaps BGR to RGB while copying into the
+                    # existing image, so no separate colour conversion is needed
+                    self._pil_image.frombytes(frame, 'raw', 'BGR')
+                    if self._tk_photo is None:
+                        self._tk_photo = ImageTk.PhotoImage(image=self._pil_image)
+                        self.video_label.configure(image=self._tk_photo)
+                    else:
+                        # Reuse the existing Tk image storage instead of a new PhotoImage
+                        self._tk_photo.paste(self._pil_image)
             except Exception as e:
                 self.add_alert(f"⚠️ Camera error: {str(e)}")
                 self.stop_detection()
             
             self.root.after(30, self.update_camera)
 
-    def motion_detection(self):
+    def motion_detection(self, stop):
         try:
-            _, prev_frame = self.cap.read()
-            prev_gray = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
+            frame = None
+            while not stop.is_set() and frame is None:
+                frame = self.wait_for_frame()
+            if frame is None:
+                return
+            # With OpenCL each frame is uploaded once and the background model
+            # and mask stay on the device
+            to_device = cv2.UMat if self.use_opencl else np.asarray
+            small = self.downsample_gray(to_device(frame))
+            small_shape = small.get().shape if self.use_opencl else small.shape
+            # Grayscale, downsampled and foreground mask buffers, allocated once
+            # and refilled every frame. They and the model are locals of this
+            # run, so a worker still finishing a stopped run never shares them
+            width, height = self.FRAME_SIZE
+            gray_buf = to_device(np.empty((height, width), np.uint8))
+            small_buf = to_device(np.empty(small_shape, np.uint8))
+            fg_mask = to_device(np.empty(small_shape, np.uint8))
+            # Fresh background model per run, seeded with the first frame
+            bg_subtractor = self.create_bg_subtractor()
+            bg_subtractor.apply(small, fgmask=fg_mask)
+            # Motion means at least MOTION_THRESHOLD of the frame is foreground:
+            # 192 of 160x120 pixels, well above the speckle MOG2 leaves from
+            # sensor noise, yet only about a 55x55 patch at full resolution
+            min_changed_pixels = int(self.MOTION_THRESHOLD * small_shape[0] * small_shape[1])
 
-            while self.detection_active and self.cap and self.cap.isOpened():
-                ret, frame = self.cap.read()
-                if not ret:
-                    break
+            while not stop.is_set():
+                frame = self.wait_for_frame()
+                if frame is None:
+                    continue
 
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                diff = cv2.absdiff(prev_gray, gray)
-                _, threshold = cv2.threshold(diff, 30, 255, cv2.THRESH_BINARY)
-                motion = np.sum(threshold) > self.MOTION_THRESHOLD
-                self.motion_detected.set(int(motion))
-                
-                prev_gray = gray
-                time.sleep(0.1)
+                small = self.downsample_gray(to_device(frame), gray_buf, small_buf)
+                motion = self.motion_score(bg_subtractor, small, fg_mask) > min_changed_pixels
+                self._motion_flag = int(motion)
         except Exception as e:
             self.add_alert(f"⚠️ Motion detection error: {str(e)}")
 
-    def sound_detection(self):
+    @staticmethod
+    def create_bg_subtractor():
+        """Background model for motion detection; adapts to gradual lighting changes"""
+        return cv2.createBackgroundSubtractorMOG2(history=50, varThreshold=25, detectShadows=False)
+
+    @staticmethod
+    def motion_score(bg_subtractor, small, fg_mask):
+        """Update the background model with a downsampled frame and count foreground pixels"""
+        bg_subtractor.apply(small, fgmask=fg_mask)
+        return cv2.countNonZero(fg_mask)
+
+    @staticmethod
+    def downsample_gray(frame, gray=None, small=None):
+        """Convert a BGR frame (ndarray or UMat) to grayscale at 1/4 resolution per axis for motion scoring
+
+        gray and small are optional preallocated output buffers, refilled in place.
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+        # A 4x4 box average in a single pass; still anti-aliased, unlike a stride view
+        return cv2.resize(gray, None, dst=small, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+
+    def sound_detection(self, stop):
+        # The stream, ring, wake-up event and scratch buffer belong to this run
+        # alone: after a quick stop/start the old worker only closes its own stream
+        stream = None
         try:
-            self.stream = self.audio.open(
-                format=pyaudio.paFloat32,
+            # Bounded to one recording's worth as a backstop should the consumer stall
+            ring = collections.deque(
+                maxlen=self.RECORDING_DURATION * self.SAMPLE_RATE // self.CHUNK_SIZE + 1)
+            loud_event = threading.Event()
+            # Widened copy of each buffer, reused by every audio_callback
+            scratch = np.empty(self.CHUNK_SIZE, np.int64)
+            stream = self.audio.open(
+                format=self.SAMPLE_FORMAT,
                 channels=1,
-                rate=44100,
+                rate=self.SAMPLE_RATE,
                 input=True,
-                frames_per_buffer=1024,
-                stream_callback=self.audio_callback
+                frames_per_buffer=self.CHUNK_SIZE,
+                stream_callback=functools.partial(self.audio_callback, ring, loud_event, scratch)
             )
-            self.stream.start_stream()
+            stream.start_stream()
             
-            while self.detection_active and self.stream.is_active():
-                time.sleep(0.1)
+            # Thresholding, reporting and recording run here, not in the callback
+            # A loud buffer wakes this loop at once; quiet ones are drained on the
+            # timeout, which is still well inside one recording chunk of latency
+            while not stop.is_set() and stream.is_active():
+                loud_event.wait(0.1)
+                loud_event.clear()
+                while ring:
+                    self.process_audio(*ring.popleft())
                 
         except Exception as e:
             self.add_alert(f"⚠️ Sound detection error: {str(e)}")
         finally:
-            if hasattr(self, 'stream') and self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
+            if stream:
+                stream.stop_stream()
+                stream.close()
+            # Save a clip cut short by the stop, so the next run starts a fresh one
+            # instead of filling this run's buffer
+            if self.is_recording:
+                self.is_recording = False
+                self.save_audio_evidence()
+
+    def audio_callback(self, ring, loud_event, scratch, in_data, frame_count, time_info, status):
+        """Runs on the PortAudio thread: compute the buffer energy and append it.
+
+        ring, loud_event and scratch are bound per run by sound_detection.
+        deque.append is atomic and takes no lock, and the event is only touched
+        on a loud buffer, so the callback never waits on the consumer.
+        """
+        try:
+            # int64 accumulation: a full-scale int16 chunk overflows int32
+            samples = np.frombuffer(in_data, dtype=np.int16)
+            if samples.size <= scratch.size:
+                data = scratch[:samples.size]
+                np.copyto(data, samples)
+            else:
+                data = samples.astype(np.int64)
+            energy = int(np.dot(data, data))
+            loud = energy > self._energy_threshold * frame_count
+            ring.append((in_data, frame_count, energy, loud))
+            if loud:
+                loud_event.set()
+        except Exception as e:
+            self.add_alert(f"⚠️ Audio processing error: {str(e)}")
+        
+        return (None, pyaudio.paContinue)
+
+    def process_audio(self, in_data, frame_count, energy, loud):
+        """Handle one audio buffer appended by audio_callback.
 
-    def audio_callback(self, in_data, frame_count, time_info, status):
+        loud was decided in the callback by comparing squared int16 energy
+        against the squared threshold, so quiet buffers need no sqrt.
+        """
         try:
-            data = np.frombuffer(in_data, dtype=np.float32)
-            rms = librosa.feature.rms(y=data)[0][0]
-            sound = rms > self.SOUND_THRESHOLD
-            self.sound_detected.set(int(sound))
+            self._sound_flag = int(loud)
             
-            if sound and self.cooldown_expired():
-                self.auto_report("Loud Noise", f"Sound level exceeded threshold ({rms:.2f})")
+            if loud and self.cooldown_expired():
+                rms = math.sqrt(energy / frame_count) / 32768
+                # 1 just over the threshold, 5 at five times it or louder
+                severity = min(5, int(rms / self.SOUND_THRESHOLD))
+                self.auto_report("Loud Noise", f"Sound level exceeded threshold ({rms:.2f})", severity)
                 # The mapping inside auto_report will convert it to SOUND
-                self.last_event_time = time.time()
+                self.last_event_time = time.monotonic()
                 self.start_recording()
                 
             if self.is_recording:
-                self.frames.append(in_data)
-                if time.time() - self.recording_start_time >= self.RECORDING_DURATION:
+                # The clip ends after RECORDING_DURATION worth of samples, not
+                # wall time, so buffers that queued up while the consumer was
+                # busy neither lengthen it nor overrun the preallocated buffer
+                n = min(len(in_data), len(self._audio_buf) - self._audio_pos)
+                self._audio_buf[self._audio_pos:self._audio_pos + n] = memoryview(in_data)[:n]
+                self._audio_pos += n
+                if self._audio_pos >= len(self._audio_buf):
                     self.save_audio_evidence()
                     self.is_recording = False
         except Exception as e:
             self.add_alert(f"⚠️ Audio processing error: {str(e)}")
-        
-        return (None, pyaudio.paContinue)
 
     def start_recording(self):
         if not self.is_recording:
             self.is_recording = True
-            self.recording_start_time = time.time()
-            self.frames = []
+            self.recording_start_time = time.monotonic()
+            # Preallocate exactly the whole clip so recording only copies into it
+            # instead of growing a list; process_audio stops when it is full
+            sample_size = pyaudio.get_sample_size(self.SAMPLE_FORMAT)
+            self._audio_buf = bytearray(self.RECORDING_DURATION * self.SAMPLE_RATE * sample_size)
+            self._audio_pos = 0
             self.add_alert("🔴 Recording started for 10 seconds")
-            threading.Thread(target=self.record_video, daemon=True).start()
+            self.start_worker(self.record_video, self._stop_event)
 
-    def record_video(self):
+    def record_video(self, stop):
         """Capture video frames during recording"""
         try:
-            while self.is_recording and self.detection_active:
-                if int(time.time() - self.recording_start_time) % 1 == 0:
-                    self.capture_evidence("motion")
-                time.sleep(0.5)
-        except Exception as e:
-            self.add_alert(f"⚠️ Video recording error: {str(e)}")
-
-    def save_audio_evidence(self):
-        """Save recorded audio to WAV file."""
-        try:
+            # One timestamp per recording; a counter keeps filenames unique
             timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = resource_path(f"evidence/sound_{timestamp}.wav")
-            
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(self.audio.get_sample_size(pyaudio.paFloat32))
-                wf.setframerate(44100)
-                wf.writeframes(b''.join(self.frames))
-            
-            self.add_alert(f"🔊 Audio evidence saved: {filename}")
+            index = 0
+            # Save the seconds leading up to the trigger first
+            pre_trigger = list(self._frame_ring)
+            self._frame_ring.clear()
+            for i, frame in enumerate(pre_trigger):
+                self.capture_evidence(f"motion_{timestamp}_pre{i:02d}", frame)
+            # Capture once per second against fixed deadlines so the cadence
+            # does not drift with how long each capture takes
+            next_capture = self.recording_start_time
+            end = self.recording_start_time + self.RECORDING_DURATION
+            while self.is_recording and not stop.is_set() and time.monotonic() < end:
+                self.capture_evidence(f"motion_{timestamp}_{index:03d}")
+                index += 1
+                next_capture += 1.0
+                delay = next_capture - time.monotonic()
+                if delay > 0:
+                    stop.wait(delay)
         except Exception as e:
-            self.add_alert(f"⚠️ Failed to save audio: {str(e)}")
-
-    def capture_evidence(self, prefix):
-        if self.current_frame is not None:
-            try:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = resource_path(f"evidence/{prefix}_{timestamp}.jpg")
-                cv2.imwrite(filename, cv2.cvtColor(self.current_frame, cv2.COLOR_RGB2BGR))
-                self.add_alert(f"📸 Evidence saved: {filename}")
-            except Exception as e:
-                self.add_alert(f"⚠️ Failed to save image: {str(e)}")
-
-    def cooldown_expired(self):
-        return time.time() - self.last_event_time > self.EVENT_COOLDOWN
+            self.add_alert(f"⚠️ Video recording error: {str(e)}")
 
     def send_to_api(self, endpoint, data, files=None):
         """Helper method to send data to API"""
         try:
-            url = f"{self.API_BASE_URL}/{endpoint}/"
+            url = self._api_urls[endpoint]
             if files:
-                response = requests.post(url, data=data, files=files)
+                response = self.http.post(url, data=data, files=files, timeout=self.HTTP_TIMEOUT)
             else:
-                response = requests.post(url, json=data)
+                response = self.http.post(url, json=data, timeout=self.HTTP_TIMEOUT)
                 
             if response.status_code == 201:
                 self.add_alert(f"✅ Successfully sent to {endpoint}")
@@ -381,100 +756,92 @@ class SmartSecurityApp:
 
 
     def save_audio_evidence(self):
-        """Save recorded audio to WAV file and send to API with limits"""
+        """Queue recorded audio for saving as WAV and sending to API with limits"""
         try:
             timestamp = time.strftime("%Y%m%d_%H%M%S")
-            filename = resource_path(f"evidence/sound_{timestamp}.wav")
-            
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(1)
-                wf.setsampwidth(self.audio.get_sample_size(pyaudio.paFloat32))
-                wf.setframerate(44100)
-                wf.writeframes(b''.join(self.frames))
-            
-            self.add_alert(f"🔊 Audio evidence saved: {filename}")
+            filename = f"{self._evidence_dir}/sound_{timestamp}.wav"
+            sampwidth = self.audio.get_sample_size(self.SAMPLE_FORMAT)
+            pcm = memoryview(self._audio_buf)[:self._audio_pos]
+            self._io_queue.put(('wav', filename, pcm, sampwidth))
             
             # Send to API if we haven't reached the limit and have an incident
-            current_time = time.time()
+            current_time = time.monotonic()
             if (self.incident_id and 
                 self.sent_audio < self.MAX_AUDIO and 
                 current_time - self.last_api_send_time >= self.EVIDENCE_INTERVAL):
                 
-                try:
-                    with open(filename, 'rb') as audio_file:
-                        evidence_data = {
-                            "incident": self.incident_id,
-                            "evidence_type": "AUDIO",
-                            "timestamp": datetime.now().isoformat()
-                        }
-                        files = {'file': (os.path.basename(filename), audio_file, 'audio/wav')}
-                        self.send_to_api("evidences", evidence_data, files=files)
-                        self.sent_audio += 1
-                        self.last_api_send_time = current_time
-                except Exception as e:
-                    self.add_alert(f"⚠️ Failed to send audio to API: {str(e)}")
+                evidence_data = {
+                    "incident": self.incident_id,
+                    "evidence_type": "AUDIO",
+                    "timestamp": datetime.now().isoformat()
+                }
+                self._io_queue.put(('upload', filename, evidence_data, 'audio/wav'))
+                self.sent_audio += 1
+                self.last_api_send_time = current_time
                     
         except Exception as e:
             self.add_alert(f"⚠️ Failed to save audio: {str(e)}")
 
-    def capture_evidence(self, prefix):
-        """Capture image evidence and send to API with limits"""
-        if self.current_frame is not None:
+    def capture_evidence(self, name, frame=None):
+        """Queue image evidence (evidence/<name>.jpg) for saving and sending to API with limits
+
+        Uses the latest camera frame unless a frame is given.
+        """
+        if frame is None:
+            with self._latest_lock:
+                frame = self._latest_frame
+        if frame is not None:
             try:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = resource_path(f"evidence/{prefix}_{timestamp}.jpg")
-                cv2.imwrite(filename, cv2.cvtColor(self.current_frame, cv2.COLOR_RGB2BGR))
-                self.add_alert(f"📸 Evidence saved: {filename}")
+                filename = f"{self._evidence_dir}/{name}.jpg"
+                # cap.read() returns a fresh BGR array per frame, so it can be
+                # handed to the writer as-is without a copy or colour conversion
+                self._io_queue.put(('jpg', filename, frame))
                 
                 # Send to API if we haven't reached the limit and have an incident
-                current_time = time.time()
+                current_time = time.monotonic()
                 if (self.incident_id and 
                     self.sent_images < self.MAX_IMAGES and 
                     current_time - self.last_api_send_time >= self.EVIDENCE_INTERVAL):
                     
-                    try:
-                        with open(filename, 'rb') as image_file:
-                            evidence_data = {
-                                "incident": self.incident_id,
-                                "evidence_type": "IMAGE",
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            files = {'file': (os.path.basename(filename), image_file, 'image/jpeg')}
-                            self.send_to_api("evidences", evidence_data, files=files)
-                            self.sent_images += 1
-                            self.last_api_send_time = current_time
-                    except Exception as e:
-                        self.add_alert(f"⚠️ Failed to send image to API: {str(e)}")
+                    evidence_data = {
+                        "incident": self.incident_id,
+                        "evidence_type": "IMAGE",
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    self._io_queue.put(('upload', filename, evidence_data, 'image/jpeg'))
+                    self.sent_images += 1
+                    self.last_api_send_time = current_time
                         
             except Exception as e:
                 self.add_alert(f"⚠️ Failed to save image: {str(e)}")
 
+    def upload_evidence(self, filename, evidence_data, content_type):
+        """Send a saved evidence file to the API"""
+        try:
+            with open(filename, 'rb') as evidence_file:
+                files = {'file': (os.path.basename(filename), evidence_file, content_type)}
+                self.send_to_api("evidences", evidence_data, files=files)
+        except Exception as e:
+            self.add_alert(f"⚠️ Failed to send {evidence_data['evidence_type'].lower()} to API: {str(e)}")
+
     def cooldown_expired(self):
-        return time.time() - self.last_event_time > self.EVENT_COOLDOWN
+        return time.monotonic() - self.last_event_time > self.EVENT_COOLDOWN
 
-    def auto_report(self, event_type, description):
+    def auto_report(self, event_type, description, severity=1):
         """Handle automatic incident reporting with API integration"""
         incident_data = {
-            "device_id": "Hor92311A",
+            **self._AUTO_TMPL,
             "incident_type": event_type,
             "description": description,
-            "severity": random.randint(1, 3),
-            "is_verified": False,
-            "timestamp": datetime.now().isoformat(),
-            "alert_message": "System-generated alert",
-            "device_location": "Main Gate",
-            "neighborhood": "Zone A",
-            "evidence_type": "IMAGE",
-            "ai_analysis": None
+            "severity": severity,
+            "timestamp": datetime.now().isoformat()
         }
 
-        # Submit the incident
-        api_response = self.send_to_api("incidents", incident_data)
-        if api_response:
-            self.incident_id = api_response.get('id')
-            self.upload_evidence_files(self.incident_id)
-        else:
-            self.incident_id = None
+        # Post from the HTTP pool so the audio consumer keeps draining buffers.
+        # Until the new id arrives no evidence is attached, rather than
+        # attaching it to the previous incident
+        self.incident_id = None
+        self._http_pool.submit(self.report_incident, incident_data)
 
         # Save locally
         incident = {
@@ -482,14 +849,17 @@ class SmartSecurityApp:
             "desc": description,
             "time": time.strftime("%Y-%m-%d %H:%M:%S")
         }
-        self.incidents.append(incident)
-        self.save_incidents()
+        self.append_incident(incident)
         self.add_alert(f"⚠️ AUTO-REPORT: {event_type}")
-        self.video_label.config(bg="red")
-        self.root.after(1000, lambda: self.video_label.config(bg="black"))
+        self.call_in_ui(self.flash_alarm)
         self.sent_images = 0
         self.sent_audio = 0
-        self.last_api_send_time = time.time()
+        self.last_api_send_time = time.monotonic()
+
+    def flash_alarm(self):
+        """Briefly turn the camera panel red (Tk thread)."""
+        self.video_label.config(bg="red")
+        self.root.after(1000, lambda: self.video_label.config(bg="black"))
 
     def submit_report(self):
         """Handle manual incident report submission with API integration"""
@@ -501,42 +871,41 @@ class SmartSecurityApp:
             return
 
         incident_data = {
-            "device_id": "Hor92311A",
+            **self._MANUAL_TMPL,
             "incident_type": incident_type.upper(),
             "description": description,
-            "severity": random.randint(2, 5),
-            "is_verified": False,
-            "timestamp": datetime.now().isoformat(),
-
-            # New fields
-            "alert_message": "Manual alert",
-            "device_location": "Main Gate",
-            "neighborhood": "Zone A",
-            "evidence_type": "IMAGE",
-            "ai_analysis": None
+            "severity": self.MANUAL_SEVERITY,
+            "timestamp": datetime.now().isoformat()
         }
 
-        api_response = self.send_to_api("incidents", incident_data)
-        if api_response:
-            self.incident_id = api_response.get('id')
-        else:
-            self.incident_id = None
+        # Runs on the Tk thread, so don't wait for the API here
+        self._http_pool.submit(self.create_incident, incident_data)
 
         incident = {
             "type": incident_type,
             "desc": description,
             "time": time.strftime("%Y-%m-%d %H:%M:%S")
         }
-        self.incidents.append(incident)
-        self.save_incidents()
+        self.append_incident(incident)
         self.add_alert(f"📢 MANUAL REPORT: {incident_type}")
         self.incident_desc.delete("1.0", tk.END)
         messagebox.showinfo("Success", "Incident reported successfully!")
 
         self.sent_images = 0
         self.sent_audio = 0
-        self.last_api_send_time = time.time()
+        self.last_api_send_time = time.monotonic()
     
+    def report_incident(self, incident_data):
+        """Create an auto-reported incident, then attach the sample images to it"""
+        if self.create_incident(incident_data):
+            self.upload_evidence_files(self.incident_id)
+
+    def create_incident(self, incident_data):
+        """Submit an incident to the API and keep its id for evidence uploads"""
+        api_response = self.send_to_api("incidents", incident_data)
+        self.incident_id = api_response.get('id') if api_response else None
+        return self.incident_id
+
     def upload_evidence_files(self, incident_id):
         """Upload 3 random images from local folder and attach them to the incident"""
         evidence_dir = "evidence/images/"
@@ -553,15 +922,15 @@ class SmartSecurityApp:
 
         for img_name in selected_images:
             img_path = os.path.join(evidence_dir, img_name)
-            files = {
-                'evidence_file': open(img_path, 'rb')
-            }
             data = {
                 'incident': incident_id,
                 'evidence_type': 'IMAGE'
             }
             try:
-                response = requests.post(f"{self.api_base}/evidences/", files=files, data=data)
+                with open(img_path, 'rb') as img_file:
+                    files = {'evidence_file': img_file}
+                    response = self.http.post(self._api_urls["evidences"], files=files, data=data,
+                                                 timeout=self.HTTP_TIMEOUT)
                 if response.status_code in [200, 201]:
                     print(f"Uploaded: {img_name}")
                 else:
@@ -572,32 +941,84 @@ class SmartSecurityApp:
     
 
     def load_incidents(self):
-        """Load incidents from JSON file."""
+        """Load incidents from JSON-lines file, migrating a legacy incidents.json once."""
+        self.incidents = []
         try:
-            with open(resource_path("incidents.json"), "r") as f:
-                self.incidents = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.incidents = []
+            with open(self._incidents_path, "r") as f:
+                for line in f:
+                    try:
+                        self.incidents.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Blank or torn line (e.g. a crash mid-append); keep the rest
+                        continue
+        except FileNotFoundError:
+            pass
+
+        legacy_path = resource_path("incidents.json")
+        if os.path.exists(legacy_path):
+            try:
+                with open(legacy_path, "r") as f:
+                    self.incidents = json.load(f) + self.incidents
+                self.compact_incidents()
+                os.remove(legacy_path)
+            except Exception as e:
+                messagebox.showwarning("Storage Warning", f"Could not migrate incidents.json: {str(e)}")
 
-    def save_incidents(self):
-        """Save incidents to JSON file."""
+    def compact_incidents(self):
+        """Atomically rewrite the JSON-lines file from the in-memory incident list."""
+        path = self._incidents_path
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for incident in self.incidents:
+                f.write(json.dumps(incident) + "\n")
+        os.replace(tmp_path, path)
+
+    def append_incident(self, incident):
+        """Record an incident and queue it for appending to the JSON-lines file."""
+        self.incidents.append(incident)
         try:
-            with open(resource_path("incidents.json"), "w") as f:
-                json.dump(self.incidents, f)
+            self._io_queue.put(('jsonl', self._incidents_path, incident))
         except Exception as e:
             self.add_alert(f"⚠️ Failed to save incidents: {str(e)}")
 
     def add_alert(self, message):
-        """Display alerts in the GUI."""
-        self.alert_log.config(state="normal")
-        self.alert_log.insert("end", f"[{time.strftime('%H:%M:%S')}] {message}\n")
-        self.alert_log.config(state="disabled")
-        self.alert_log.see("end")
+        """Queue an alert for display in the GUI; safe to call from any thread."""
+        self._alert_queue.append(f"[{time.strftime('%H:%M:%S')}] {message}\n")
+
+    def flush_alerts(self, max_batch=100):
+        """Write queued alerts to the alert log in one widget update."""
+        lines = []
+        while self._alert_queue and len(lines) < max_batch:
+            lines.append(self._alert_queue.popleft())
+        if lines:
+            self.alert_log.config(state="normal")
+            text = "".join(lines)
+            self.alert_log.insert("end", text)
+            # Count text lines, not alerts: one alert (e.g. an API error body)
+            # can span many lines
+            self._alert_count += text.count("\n")
+            # Trim in blocks of 100 so the delete doesn't run on every flush
+            if self._alert_count > self.MAX_ALERT_LINES:
+                excess = self._alert_count - self.MAX_ALERT_LINES + 100
+                self.alert_log.delete("1.0", f"{excess + 1}.0")
+                self._alert_count -= excess
+            self.alert_log.config(state="disabled")
+            self.alert_log.see("end")
+        self.root.after(150, self.flush_alerts)
 
     def on_close(self):
         """Clean up resources when closing the window."""
         self.detection_active = False
-        time.sleep(0.5)  # Give threads time to stop
+        self._stop_event.set()
+        # Workers exit as soon as they see the stop event; give them 0.5 s in
+        # total, then leave any stuck in a driver call to die with the process
+        deadline = time.monotonic() + 0.5
+        for worker in self._workers:
+            worker.join(max(0, deadline - time.monotonic()))
+        # Let queued incident lines and evidence files finish writing
+        self._io_queue.put(None)
+        self._io_thread.join(timeout=2)
+        self._http_pool.shutdown(wait=False, cancel_futures=True)
         
         try:
             if hasattr(self, 'cap') and self.cap and self.cap.isOpened():
@@ -606,18 +1027,15 @@ class SmartSecurityApp:
             pass
         
         try:
-            if hasattr(self, 'stream') and self.stream:
-                self.stream.stop_stream()
-                self.stream.close()
-        except:
-            pass
-        
-        try:
+            # Also closes a stream left open by a sound worker that did not exit
             if hasattr(self, 'audio') and self.audio:
                 self.audio.terminate()
         except:
             pass
         
+        # self.http is left open: HTTP pool threads may still be finishing a
+        # request, and every call is bounded by HTTP_TIMEOUT, which in turn
+        # bounds how long interpreter exit waits to join them
         cv2.destroyAllWindows()
         self.root.destroy()
 